@@ -195,6 +195,12 @@ export function understandQuery(query) {
 // Corpus statistics (IDF)
 // ────────────────────────────────────────────────────────────────────────────
 
+/** Distinct lowercase tokens a server is indexed under. */
+function corpusTokens(s) {
+  const text = `${s.fields?.name || ''} ${s.fields?.description || ''} ${s.fields?.author || ''}`.toLowerCase();
+  return new Set(tokenize(text));
+}
+
 /**
  * Build a document-frequency index over a corpus for IDF weighting.
  * @param {ServerLike[]} servers
@@ -203,13 +209,72 @@ export function understandQuery(query) {
 export function buildCorpusIndex(servers) {
   const df = new Map();
   for (const s of servers) {
-    const text = `${s.fields?.name || ''} ${s.fields?.description || ''} ${s.fields?.author || ''}`.toLowerCase();
-    const seen = new Set(tokenize(text));
-    for (const tok of seen) df.set(tok, (df.get(tok) || 0) + 1);
+    for (const tok of corpusTokens(s)) df.set(tok, (df.get(tok) || 0) + 1);
   }
   return { df, n: servers.length || 1 };
 }
 
+/**
+ * Build the serialisable inverted index shipped next to a corpus as
+ * `search-index.json` (see scripts/build-mcp-data.ts): `postings[token]`
+ * lists the positions in `servers` of every server containing the token.
+ * @param {ServerLike[]} servers
+ * @returns {{ version: number, n: number, ids: string[], postings: Record<string, number[]> }}
+ */
+export function buildSearchIndex(servers) {
+  const postings = new Map();
+  servers.forEach((s, pos) => {
+    for (const tok of corpusTokens(s)) {
+      if (!postings.has(tok)) postings.set(tok, []);
+      postings.get(tok).push(pos);
+    }
+  });
+  return {
+    version: 1,
+    n: servers.length,
+    ids: servers.map((s) => s.id),
+    postings: Object.fromEntries([...postings].sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))),
+  };
+}
+
+/**
+ * Rehydrate a corpus index from a prebuilt `search-index.json`, skipping the
+ * tokenizing pass. The postings travel along so `searchServers` can narrow
+ * candidates — pass it only with the exact `servers` array it was built from.
+ * @param {{ n: number, postings: Record<string, number[]> }} searchIndex
+ * @returns {{ df: Map<string, number>, n: number, postings: Map<string, number[]> }}
+ */
+export function corpusIndexFromSearchIndex(searchIndex) {
+  const df = new Map();
+  const postings = new Map(Object.entries(searchIndex?.postings || {}));
+  for (const [tok, docs] of postings) df.set(tok, docs.length);
+  return { df, n: searchIndex?.n || 1, postings };
+}
+
+/**
+ * Positions of servers that can text-match the query: those indexed under a
+ * token containing a query token at a word boundary — the same rule as
+ * `matchIn`, so the result is a superset of text matches. Returns null when
+ * postings can't narrow without changing results: no postings, or the query
+ * carries category / deployment / security / language signals, which can
+ * match a server with no text hit at all.
+ */
+function candidatePositions(u, index, size) {
+  if (!index.postings || index.n !== size) return null;
+  if (u.categories.length || u.deployments.length || u.languages.length) return null;
+  if (Object.values(u.security).some(Boolean)) return null;
+
+  const patterns = u.tokens.filter(isMatchableToken)
+    .map((t) => new RegExp('(^|[^a-z0-9])' + escapeRegex(t), 'i'));
+  if (!patterns.length) return null;
+
+  const positions = new Set();
+  for (const [tok, docs] of index.postings) {
+    if (patterns.some((re) => re.test(tok))) for (const p of docs) positions.add(p);
+  }
+  return [...positions].sort((a, b) => a - b);
+}
+
 /** idf(t) = log(1 + N / df(t)); tokens absent from the corpus still get a floor. */
 function idf(token, index) {
   const df = index.df.get(token) || 0;
@@ -336,7 +401,10 @@ export function scoreServer(server, u, index) {
  *
  * @param {string} query
  * @param {ServerLike[]} servers
- * @param {{limit?: number}} [opts]
+ * @param {{limit?: number, index?: {df: Map<string, number>, n: number, postings?: Map<string, number[]>}}} [opts]
+ *   `index` — a corpus index built once up front (see `buildCorpusIndex` /
+ *   `corpusIndexFromSearchIndex`); rebuilt from `servers` when omitted. With
+ *   postings, text-only queries score just the candidate servers.
  * @returns {{ query:string, inferredFilters:QueryUnderstanding, hits:SearchHit[], total:number, tookMs:number }}
  */
 export function searchServers(query, servers, opts = {}) {
@@ -345,9 +413,11 @@ export function searchServers(query, servers, opts = {}) {
   const u = understandQuery(query);
   const hasQuery = u.tokens.some(isMatchableToken) || u.categories.length || u.deployments.length ||
     u.security.safe || u.security.readonly || u.security.parameterized || u.security.authed || u.languages.length;
-  const index = buildCorpusIndex(servers);
+  const index = opts.index ?? buildCorpusIndex(servers);
+  const positions = hasQuery ? candidatePositions(u, index, servers.length) : null;
+  const pool = positions ? positions.map((p) => servers[p]) : servers;
 
-  const scored = servers
+  const scored = pool
     .map((server) => ({ server, ...scoreServer(server, u, index) }))
     .filter((h) => (hasQuery ? h.matched : true))
     .sort((a, b) => b.score - a.score);
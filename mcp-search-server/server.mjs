@@ -22,12 +22,26 @@
 import { McpServer } from '@modelcontextprotocol/sdk/server/mcp.js';
 import { StdioServerTransport } from '@modelcontextprotocol/sdk/server/stdio.js';
 import { z } from 'zod';
-import { searchServers, summarizeFilters } from './lib/search-engine.js';
+import {
+  buildCorpusIndex,
+  corpusIndexFromSearchIndex,
+  searchServers,
+  summarizeFilters,
+} from './lib/search-engine.js';
 import staticData from './data/static-data.json' with { type: 'json' };
+import searchIndex from './data/search-index.json' with { type: 'json' };
 
 const BASE_API_URL = process.env.MYMCPSHELF_API_URL || 'https://www.mymcpshelf.com';
 const FALLBACK_SERVERS = staticData.servers || [];
 const BY_ID = new Map(FALLBACK_SERVERS.map((s) => [s.id, s]));
+// search-index.json is prebuilt from the same array as static-data.json by
+// scripts/build-mcp-data.ts; only fall back to tokenizing at startup if the
+// two ever drift apart, since its postings are positions into that array.
+const FALLBACK_INDEX =
+  searchIndex.ids?.length === FALLBACK_SERVERS.length &&
+  searchIndex.ids.every((id, i) => id === FALLBACK_SERVERS[i].id)
+    ? corpusIndexFromSearchIndex(searchIndex)
+    : buildCorpusIndex(FALLBACK_SERVERS);
 
 // ── HTTP helpers ───────────────────────────────────────────────────────────
 
@@ -139,7 +153,7 @@ mcp.tool(
     }
 
     // Fallback: local static search
-    const res = searchServers(query || '', FALLBACK_SERVERS, { limit: lim });
+    const res = searchServers(query || '', FALLBACK_SERVERS, { limit: lim, index: FALLBACK_INDEX });
     const filters = summarizeFilters(res.inferredFilters);
     const lines = [];
     lines.push(`My MCP Shelf — ${res.total} match(es) for "${query || '(most popular)'}" [offline fallback]`);
@@ -2,7 +2,9 @@
  * Build static fallback data for the MCP search server package.
  *
  * Generates mcp-search-server/data/static-data.json from the curated
- * staticServers.js dataset enriched with manual security audits.
+ * staticServers.js dataset enriched with manual security audits, plus the
+ * prebuilt inverted index (data/search-index.json) the server loads instead
+ * of tokenizing the corpus at startup.
  * Also copies src/lib/search-engine.js into the package so the MCP
  * server can import it without ../src/ relative paths.
  */
@@ -10,6 +12,7 @@ import * as fs from 'fs';
 import * as path from 'path';
 import { staticServers } from '../src/data/staticServers.js';
 import { getSecurityAudit } from '../src/data/securityAudit';
+import { buildSearchIndex } from '../src/lib/search-engine.js';
 
 const enrichedServers = (staticServers as any[]).map((s) => {
   const audit = getSecurityAudit(s.id);
@@ -33,9 +36,16 @@ fs.writeFileSync(
   JSON.stringify(staticData, null, 2)
 );
 
+// Built from the same array, in the same order: postings are positions into it.
+fs.writeFileSync(
+  path.join(dataDir, 'search-index.json'),
+  JSON.stringify({ generatedAt: staticData.generatedAt, ...buildSearchIndex(enrichedServers) })
+);
+
 const engineSrc = path.join(process.cwd(), 'src', 'lib', 'search-engine.js');
 const engineDest = path.join(libDir, 'search-engine.js');
 fs.copyFileSync(engineSrc, engineDest);
 
 console.log(`Built mcp-search-server/data/static-data.json (${enrichedServers.length} servers)`);
+console.log(`Built mcp-search-server/data/search-index.json`);
 console.log(`Copied search-engine.js to mcp-search-server/lib/search-engine.js`);
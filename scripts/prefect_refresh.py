@@ -5,12 +5,15 @@ Nightly pipeline that keeps the MCP directory's server catalogue fresh:
 
   1. Fetch every server from PulseMCP  (paginated, per-task retries)
   2. Transform records to the site's internal MCPServer shape
-  3. Publish Prefect Artifacts — markdown run summary + category/stars tables
-  4. Write  src/data/servers.json
-  5. Commit & push servers.json to GitHub via the REST API
+  3. Compute 7-/30-day star & download trends against the run-history store
+  4. Publish Prefect Artifacts — markdown run summary + category/stars/trending tables
+  5. Write  src/data/servers.json and the prebuilt related-servers.json next
+     to it, and append a columnar snapshot to the run-history store
+     (data/server-history/YYYY-MM-DD.npz)
+  6. Commit & push servers.json to GitHub via the REST API
      (no git binary required; authenticates with GITHUB_TOKEN)
-  6. Trigger a Cloudflare Pages rebuild via deploy hook
-  7. Post a Slack notification with the run summary
+  7. Trigger a Cloudflare Pages rebuild via deploy hook
+  8. Post a Slack notification with the run summary
 
 Quick start
 -----------
@@ -38,6 +41,26 @@ Optional:
   PULSEMCP_MAX_SERVERS  how many servers to fetch        (default: 5000)
   CLOUDFLARE_DEPLOY_HOOK  Cloudflare Pages deploy-hook URL
   SLACK_WEBHOOK_URL     Slack incoming-webhook URL for notifications
+  SERVER_HISTORY_DIR    run-history store location   (default: data/server-history)
+  REFRESH_SHARD_SIZE    offsets per shard in sharded mode (default: 1000)
+  REFRESH_SHARD_DIR     shard exchange directory      (default: data/refresh-shards)
+  REFRESH_SHARD_DEPLOYMENT  shard deployment to dispatch  (default: "refresh-mcp-shard/shard")
+  REFRESH_SHARD_OVERLAP offsets each shard reads past its end (default: 50)
+  REFRESH_SHARD_TIMEOUT seconds to wait for dispatched shard runs (default: 2700)
+
+Sharded mode
+------------
+  refresh_server_data_sharded splits the offset range into shards, runs
+  refresh_shard for each (in-process subflows, or deployment runs picked up
+  by any worker in mcp-work-pool), merges the raw shard files, then
+  transforms and publishes once exactly like the single-worker flow.
+
+  # in-process, shards run one after another
+  python scripts/prefect_refresh.py --sharded --shard-size 500 --dry-run
+
+  # across workers — start several, then trigger the coordinator
+  prefect worker start --pool mcp-work-pool        # × N
+  prefect deployment run 'refresh-mcp-server-data-sharded/sharded-refresh'
 """
 
 from __future__ import annotations
@@ -48,16 +71,20 @@ import json
 import os
 import re
 import shlex
+import shutil
 import subprocess
 import time
 from collections import Counter
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
 import httpx
-from prefect import flow, task, get_run_logger
+import numpy as np
+from prefect import flow, task, get_client, get_run_logger
 from prefect.artifacts import create_markdown_artifact, create_table_artifact
+from prefect.deployments import run_deployment
+from prefect.runtime import flow_run
 
 # ---------------------------------------------------------------------------
 # Compatibility shim — starlette 1.3+ / fastapi 0.137+ renamed
@@ -85,6 +112,48 @@ RETRY_DELAY_SECS = 5
 OUTPUT_PATH      = Path(__file__).parent.parent / "src" / "data" / "servers.json"
 GITHUB_FILE_PATH = "src/data/servers.json"   # path inside the repo
 
+# Prebuilt top-k related-servers table read by the server detail page, so it
+# doesn't scan the whole catalogue per page.  Only used by builds that render
+# this same servers.json (matched on generated_at).
+RELATED_PATH      = OUTPUT_PATH.parent / "related-servers.json"
+RELATED_TOP_K     = 5       # RelatedServers.astro shows five
+# Terms held by more than RELATED_DENSE_DF servers (the category token above
+# all) would make the sparse pair join grow with n², so they are scored with a
+# dense matrix product instead.  Each similarity block is sized so it holds at
+# most RELATED_BLOCK_CELLS scores and RELATED_BLOCK_PAIRS sparse term pairs.
+RELATED_DENSE_DF    = 256
+RELATED_BLOCK_CELLS = 2_000_000   # rows × n float64 scores ≈ 16 MB
+RELATED_BLOCK_PAIRS = 1_000_000
+
+# Run-history store: one compressed columnar snapshot per UTC day plus a shared
+# append-only id/category dictionary (index.json).  Nightly snapshots are kept
+# for HISTORY_DAILY_DAYS (enough to cover the 30-day window), then thinned to
+# one per ISO week, and dropped entirely after HISTORY_WEEKLY_DAYS.
+HISTORY_DIR         = Path(os.getenv(
+    "SERVER_HISTORY_DIR",
+    Path(__file__).parent.parent / "data" / "server-history",
+))
+HISTORY_DAILY_DAYS  = 35
+HISTORY_WEEKLY_DAYS = 400
+TRENDING_WINDOWS    = (7, 30)         # days; the first window drives the rank
+
+# Sharded mode: the coordinator splits [0, max_servers) into offset ranges of
+# REFRESH_SHARD_SIZE and each shard flow writes shard-<start>.json under a
+# per-run directory in REFRESH_SHARD_DIR.  For deployment dispatch across
+# machines that directory must be shared storage (NFS, mounted bucket, …).
+# Shards are fetched at different moments, so each one reads SHARD_OVERLAP
+# offsets past its end: a server that slides back across a boundary between
+# two shard fetches is still picked up, and the merge drops the duplicates.
+SHARD_ROOT       = Path(os.getenv(
+    "REFRESH_SHARD_DIR",
+    Path(__file__).parent.parent / "data" / "refresh-shards",
+))
+SHARD_SIZE       = int(os.getenv("REFRESH_SHARD_SIZE", "1000"))
+SHARD_DEPLOYMENT = os.getenv("REFRESH_SHARD_DEPLOYMENT", "refresh-mcp-shard/shard")
+SHARD_OVERLAP    = int(os.getenv("REFRESH_SHARD_OVERLAP", "50"))
+SHARD_TIMEOUT_SECS = int(os.getenv("REFRESH_SHARD_TIMEOUT", "2700"))   # < coordinator's 1 h
+SHARD_POLL_SECS  = 10
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -146,6 +215,400 @@ def _github_avatar(github_url: str) -> str | None:
     return f"https://github.com/{m.group(1)}.png?size=128" if m else None
 
 
+# ---------------------------------------------------------------------------
+# Helpers — run-history store (columnar snapshots)
+# ---------------------------------------------------------------------------
+
+def _load_history_index() -> dict[str, Any]:
+    """Load the shared key/category dictionaries (codes are list positions).
+
+    ``generation`` changes whenever the dictionaries are compacted; snapshots
+    record the generation they were coded against.
+    """
+    path = HISTORY_DIR / "index.json"
+    if not path.exists():
+        return {"generation": 0, "ids": [], "categories": []}
+    return json.loads(path.read_text())
+
+
+def _save_history_index(index: dict[str, Any]) -> None:
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = HISTORY_DIR / "index.json.tmp"
+    tmp.write_text(json.dumps(index, ensure_ascii=False))
+    tmp.replace(HISTORY_DIR / "index.json")
+
+
+def _history_key(server: dict) -> str:
+    """History identity of a server: site id plus repository URL.
+
+    The site id alone is a name slug, so distinct same-name servers share it;
+    monorepos share a URL across differently named servers.  Together they
+    separate both.
+    """
+    return f"{server['id']}\t{server['fields'].get('github_url') or ''}"
+
+
+def _encode_snapshot(servers: list[dict], index: dict[str, Any]) -> dict[str, np.ndarray]:
+    """Encode servers as dictionary-coded columns keyed by ``_history_key``.
+
+    Unseen keys/categories are appended to ``index`` in place, so existing
+    codes stay stable across runs (until ``_compact_history_index``).
+    """
+    id_codes  = {v: i for i, v in enumerate(index["ids"])}
+    cat_codes = {v: i for i, v in enumerate(index["categories"])}
+
+    def _code(table: dict[str, int], values: list[str], key: str) -> int:
+        if key not in table:
+            table[key] = len(values)
+            values.append(key)
+        return table[key]
+
+    return {
+        "id_code": np.fromiter(
+            (_code(id_codes, index["ids"], _history_key(s)) for s in servers),
+            dtype=np.int32, count=len(servers),
+        ),
+        "stars": np.fromiter(
+            (s["fields"].get("stars") or 0 for s in servers),
+            dtype=np.int64, count=len(servers),
+        ),
+        "downloads": np.fromiter(
+            (s["fields"].get("downloads") or 0 for s in servers),
+            dtype=np.int64, count=len(servers),
+        ),
+        "category_code": np.fromiter(
+            (_code(cat_codes, index["categories"], s["fields"]["category"]) for s in servers),
+            dtype=np.int16, count=len(servers),
+        ),
+    }
+
+
+def _history_snapshots() -> list[tuple[date, Path]]:
+    """Return (day, path) for every stored snapshot, oldest first."""
+    snapshots: list[tuple[date, Path]] = []
+    for path in HISTORY_DIR.glob("*.npz"):
+        try:
+            snapshots.append((date.fromisoformat(path.stem), path))
+        except ValueError:
+            continue   # not one of ours
+    return sorted(snapshots)
+
+
+def _load_snapshot(path: Path) -> dict[str, np.ndarray]:
+    with np.load(path) as npz:
+        return {key: npz[key] for key in npz.files}
+
+
+def _save_snapshot(path: Path, arrays: dict[str, np.ndarray]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        np.savez_compressed(fh, **arrays)
+    tmp.replace(path)
+
+
+def _snapshot_generation(snapshot: dict[str, np.ndarray]) -> int:
+    return int(snapshot["generation"]) if "generation" in snapshot else 0
+
+
+def _duplicated(codes: np.ndarray, size: int) -> np.ndarray:
+    """Mask of codes that occur more than once (their rows can't be told apart)."""
+    return np.bincount(codes, minlength=size) > 1
+
+
+def _dense(snapshot: dict[str, np.ndarray], column: str, size: int) -> np.ndarray:
+    """Scatter a snapshot column into an array indexed by id code (-1 = absent)."""
+    out = np.full(size, -1, dtype=np.int64)
+    out[snapshot["id_code"]] = snapshot[column]
+    return out
+
+
+def _trending_rank(eligible: np.ndarray, primary: np.ndarray, secondary: np.ndarray) -> np.ndarray:
+    """1-based rank by ``primary`` then ``secondary`` (both descending).
+
+    Entries outside ``eligible`` get 0.
+    """
+    candidates = np.flatnonzero(eligible)
+    order      = candidates[np.lexsort((-secondary[candidates], -primary[candidates]))]
+    rank       = np.zeros(len(eligible), dtype=np.int64)
+    rank[order] = np.arange(1, len(order) + 1)
+    return rank
+
+
+def _apply_history_retention(today: date) -> list[Path]:
+    """Thin snapshots to one per ISO week past the daily horizon, drop the rest."""
+    removed:    list[Path] = []
+    kept_weeks: set[tuple[int, int]] = set()
+
+    for day, path in reversed(_history_snapshots()):   # newest first
+        age = (today - day).days
+        if age <= HISTORY_DAILY_DAYS:
+            continue
+        week = tuple(day.isocalendar())[:2]
+        if age <= HISTORY_WEEKLY_DAYS and week not in kept_weeks:
+            kept_weeks.add(week)
+            continue
+        path.unlink()
+        removed.append(path)
+
+    return removed
+
+
+def _compact_history_index() -> int:
+    """Rebuild index.json from the codes the stored snapshots still reference.
+
+    Retention deletes snapshots but codes are only ever appended, so without
+    this the dictionary would keep every key ever seen (including churning
+    ``pulsemcp-N`` fallback ids).  Kept snapshots are re-coded under a new
+    generation and index.json is replaced last; if that is interrupted,
+    snapshots whose generation doesn't match index.json are skipped by
+    compute_trending and deleted by the next compaction.  Returns the number
+    of keys dropped.
+    """
+    index      = _load_history_index()
+    generation = index.get("generation", 0)
+
+    snapshots: list[tuple[Path, dict[str, np.ndarray]]] = []
+    for _, path in _history_snapshots():
+        snapshot = _load_snapshot(path)
+        if _snapshot_generation(snapshot) != generation:
+            path.unlink()   # coded against a dictionary that no longer exists
+            continue
+        snapshots.append((path, snapshot))
+
+    used_ids  = np.unique(np.concatenate([s["id_code"] for _, s in snapshots] or [np.empty(0, np.int32)]))
+    used_cats = np.unique(np.concatenate([s["category_code"] for _, s in snapshots] or [np.empty(0, np.int16)]))
+    if len(used_ids) == len(index["ids"]) and len(used_cats) == len(index["categories"]):
+        return 0
+
+    id_map  = np.full(len(index["ids"]), -1, dtype=np.int32)
+    cat_map = np.full(len(index["categories"]), -1, dtype=np.int16)
+    id_map[used_ids]   = np.arange(len(used_ids))
+    cat_map[used_cats] = np.arange(len(used_cats))
+
+    for path, snapshot in snapshots:
+        _save_snapshot(path, {
+            **snapshot,
+            "id_code":       id_map[snapshot["id_code"]],
+            "category_code": cat_map[snapshot["category_code"]],
+            "generation":    np.int64(generation + 1),
+        })
+    _save_history_index({
+        "generation": generation + 1,
+        "ids":        [index["ids"][code] for code in used_ids.tolist()],
+        "categories": [index["categories"][code] for code in used_cats.tolist()],
+    })
+    return len(index["ids"]) - len(used_ids)
+
+
+# ---------------------------------------------------------------------------
+# Helpers — related servers
+# ---------------------------------------------------------------------------
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+
+_RELATED_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "that", "this", "from", "into", "your", "you",
+    "are", "can", "its", "via", "using", "use", "server", "servers", "mcp",
+    "model", "context", "protocol", "provides", "allows", "enables", "tool",
+    "tools", "access", "data", "integration", "available", "description",
+})
+
+
+def _related_terms(server: dict) -> list[str]:
+    """Terms for similarity: name tokens count double, plus a category term."""
+    f    = server["fields"]
+    name = _TERM_RE.findall((f.get("name") or "").lower())
+    desc = _TERM_RE.findall((f.get("description") or "").lower())
+    terms = [t for t in name * 2 + desc if len(t) > 2 and t not in _RELATED_STOPWORDS]
+    terms.append(f"category:{f.get('category') or ''}")
+    return terms
+
+
+def _related_top_k(servers: list[dict], k: int) -> dict[str, list[str]]:
+    """Top-k most similar servers per server by TF-IDF cosine similarity.
+
+    The whole vocabulary is kept as a sparse (doc, term, weight) list and
+    split by document frequency.  Terms with df ≤ RELATED_DENSE_DF are scored
+    by joining each entry with the other entries of the same term and summing
+    the products with ``bincount``; the few terms above that are scored with
+    a dense ``n × H`` matrix product, so no term contributes df² pairs.  Rows
+    are processed in blocks bounded by RELATED_BLOCK_CELLS scores and
+    RELATED_BLOCK_PAIRS joined pairs, which caps peak memory whatever the
+    catalogue size; total time still grows with n² through the score matrix.
+    Servers with no positive similarity are omitted.
+    """
+    n = len(servers)
+    k = min(k, n - 1)
+    if k <= 0:
+        return {}
+
+    vocab:    dict[str, int] = {}
+    doc_list:  list[int] = []
+    term_list: list[int] = []
+    for i, server in enumerate(servers):
+        for term in _related_terms(server):
+            doc_list.append(i)
+            term_list.append(vocab.setdefault(term, len(vocab)))
+
+    # Unique (doc, term) entries with term counts, sorted doc-major.
+    width    = len(vocab)
+    keys, tf = np.unique(
+        np.asarray(doc_list, dtype=np.int64) * width + np.asarray(term_list, dtype=np.int64),
+        return_counts=True,
+    )
+    docs, terms = keys // width, keys % width
+
+    df      = np.bincount(terms, minlength=width)
+    weights = np.log1p(tf) * (np.log(n / df[terms]) + 1.0)
+    norms   = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=n))
+    weights = weights / np.where(norms > 0, norms, 1.0)[docs]
+
+    # Terms held by a single server can't link two servers; drop them only
+    # after normalising so they still dilute that server's other terms.
+    shared = df[terms] >= 2
+    docs, terms, weights = docs[shared], terms[shared], weights[shared]
+
+    # High-df terms → dense n × H weight matrix.
+    common    = df[terms] > RELATED_DENSE_DF
+    dense_col = np.full(width, -1, dtype=np.int64)
+    dense_ids = np.unique(terms[common])
+    dense_col[dense_ids] = np.arange(len(dense_ids))
+    dense = np.zeros((n, len(dense_ids)))
+    dense[docs[common], dense_col[terms[common]]] = weights[common]
+    docs, terms, weights = docs[~common], terms[~common], weights[~common]
+
+    by_term    = np.argsort(terms, kind="stable")
+    term_df    = np.bincount(terms, minlength=width)
+    term_start = np.concatenate(([0], np.cumsum(term_df)[:-1]))
+    doc_start  = np.searchsorted(docs, np.arange(n + 1))
+
+    # Block boundaries: cumulative joined pairs per row, capped per block.
+    pair_cum = np.concatenate(([0], np.cumsum(np.bincount(docs, weights=term_df[terms], minlength=n))))
+    max_rows = max(1, RELATED_BLOCK_CELLS // n)
+
+    ids     = [s["id"] for s in servers]
+    related: dict[str, list[str]] = {}
+
+    start = 0
+    while start < n:
+        stop   = int(np.searchsorted(pair_cum, pair_cum[start] + RELATED_BLOCK_PAIRS, side="right")) - 1
+        stop   = min(max(stop, start + 1), start + max_rows, n)
+        lo, hi = doc_start[start], doc_start[stop]
+        b_docs, b_terms, b_weights = docs[lo:hi], terms[lo:hi], weights[lo:hi]
+
+        lengths = term_df[b_terms]
+        src     = np.repeat(np.arange(hi - lo), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        partner = by_term[term_start[b_terms][src] + offsets]
+
+        rows  = stop - start
+        block = np.bincount(
+            (b_docs[src] - start) * n + docs[partner],
+            weights=b_weights[src] * weights[partner],
+            minlength=rows * n,
+        ).astype(np.float64, copy=False).reshape(rows, n)   # int64 when no pairs
+        block += dense[start:stop] @ dense.T
+        span = np.arange(rows)
+        block[span, span + start] = -1.0   # never recommend a server to itself
+
+        top    = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(block, top, axis=1)
+        order  = np.argsort(-scores, axis=1, kind="stable")
+        top    = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+
+        for row, (cands, sims) in enumerate(zip(top.tolist(), scores.tolist())):
+            picks = [ids[j] for j, sim in zip(cands, sims) if sim > 1e-9]
+            if picks:
+                related[ids[start + row]] = picks
+
+        start = stop
+
+    return related
+
+
+def _write_json_atomic(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+    tmp.replace(path)
+
+
+# ---------------------------------------------------------------------------
+# Helpers — sharded refresh
+# ---------------------------------------------------------------------------
+
+def _shard_ranges(max_servers: int, shard_size: int, overlap: int = 0) -> list[tuple[int, int, int]]:
+    """Split offsets [0, max_servers) into half-open ranges of shard_size.
+
+    Returns (start, end, overlap) triples; every shard but the last reads
+    ``overlap`` extra offsets past ``end``.
+    """
+    starts = range(0, max_servers, shard_size)
+    return [
+        (start, min(start + shard_size, max_servers), overlap if start + shard_size < max_servers else 0)
+        for start in starts
+    ]
+
+
+def _shard_path(shard_dir: Path, start: int) -> Path:
+    return shard_dir / f"shard-{start:07d}.json"
+
+
+def _raw_key(record: dict) -> tuple[str, str, str]:
+    """Identity of a raw PulseMCP record for boundary dedupe.
+
+    Derived site ids aren't unique (same-name servers share a slug, fallback
+    ids are positional), so match on the record's own id/URL and name.
+    """
+    url = record.get("source_code_url") or record.get("external_url") or record.get("url") or ""
+    return (str(record.get("id") or ""), url, record.get("name") or "")
+
+
+def _dispatch_shard_deployments(shard_dir: str, ranges: list[tuple[int, int, int]]) -> None:
+    """Start one SHARD_DEPLOYMENT run per range and block until all finish.
+
+    Runs are created without waiting (timeout=0) so every idle worker in the
+    pool can pick one up, then polled together.  Raises if any shard run ends
+    in a non-COMPLETED state, or with the still-pending runs if they haven't
+    all finished within SHARD_TIMEOUT_SECS (e.g. no worker is polling).
+    """
+    logger = get_run_logger()
+    runs = [
+        run_deployment(
+            name=SHARD_DEPLOYMENT,
+            parameters={"start": start, "end": end, "shard_dir": shard_dir, "overlap": overlap},
+            timeout=0,
+        )
+        for start, end, overlap in ranges
+    ]
+    logger.info(f"Dispatched {len(runs)} shard run(s) to {SHARD_DEPLOYMENT}")
+
+    deadline = time.monotonic() + SHARD_TIMEOUT_SECS
+    pending  = {run.id: run.name for run in runs}
+    failed: list[str] = []
+    with get_client(sync_client=True) as client:
+        while pending:
+            time.sleep(SHARD_POLL_SECS)
+            for run_id in list(pending):
+                run = client.read_flow_run(run_id)
+                pending[run_id] = run.name
+                if run.state and run.state.is_final():
+                    del pending[run_id]
+                    if not run.state.is_completed():
+                        failed.append(f"{run.name} ({run.state.name})")
+            logger.info(f"Shard runs finished: {len(runs) - len(pending)}/{len(runs)}")
+
+            if pending and time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"{len(pending)} shard run(s) still pending after {SHARD_TIMEOUT_SECS}s: "
+                    f"{', '.join(sorted(pending.values()))}"
+                )
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} shard run(s) did not complete: {', '.join(failed)}")
+
+
 # ---------------------------------------------------------------------------
 # Tasks — data pipeline
 # ---------------------------------------------------------------------------
@@ -157,13 +620,13 @@ def _github_avatar(github_url: str) -> str | None:
     retry_jitter_factor=0.5,
     tags=["pulsemcp", "fetch"],
 )
-def fetch_page(offset: int) -> tuple[list[dict], bool]:
+def fetch_page(offset: int, count: int = COUNT_PER_PAGE) -> tuple[list[dict], bool]:
     """Fetch a single page of servers from PulseMCP.
 
     Returns (servers, has_next).  Raises on any error so Prefect retries.
     """
     logger = get_run_logger()
-    url = f"{PULSEMCP_BASE}/servers?count_per_page={COUNT_PER_PAGE}&offset={offset}"
+    url = f"{PULSEMCP_BASE}/servers?count_per_page={count}&offset={offset}"
 
     with httpx.Client(timeout=30) as client:
         resp = client.get(url)
@@ -188,33 +651,49 @@ def fetch_page(offset: int) -> tuple[list[dict], bool]:
     return servers, has_next
 
 
-@task(name="fetch-all-servers", tags=["pulsemcp", "fetch"])
-def fetch_all_servers(max_servers: int) -> list[dict]:
-    """Paginate through PulseMCP until we reach max_servers or exhaust all pages."""
+def _fetch_range(start: int, end: int) -> list[dict]:
+    """Paginate through PulseMCP from offset ``start`` up to (not incl.) ``end``."""
     logger = get_run_logger()
-    all_servers: list[dict] = []
-    offset = 0
+    servers: list[dict] = []
+    offset = start
 
-    while len(all_servers) < max_servers:
-        page, has_next = fetch_page(offset)
+    while offset < end:
+        page, has_next = fetch_page(offset, min(COUNT_PER_PAGE, end - offset))
 
         if not page:
             logger.info("Empty page — end of results")
             break
 
-        all_servers.extend(page)
+        servers.extend(page)
         offset += len(page)
-        logger.info(f"Running total: {len(all_servers):,} servers")
+        logger.info(f"Running total: {len(servers):,} servers")
 
-        if not has_next or len(all_servers) >= max_servers:
+        if not has_next:
             break
 
         time.sleep(0.25)   # polite rate-limiting
 
+    return servers
+
+
+@task(name="fetch-all-servers", tags=["pulsemcp", "fetch"])
+def fetch_all_servers(max_servers: int) -> list[dict]:
+    """Paginate through PulseMCP until we reach max_servers or exhaust all pages."""
+    logger = get_run_logger()
+    all_servers = _fetch_range(0, max_servers)
     logger.info(f"Fetch complete: {len(all_servers):,} servers")
     return all_servers
 
 
+@task(name="fetch-server-range", tags=["pulsemcp", "fetch", "shard"])
+def fetch_server_range(start: int, end: int) -> list[dict]:
+    """Fetch one shard's slice of the catalogue: offsets [start, end)."""
+    logger  = get_run_logger()
+    servers = _fetch_range(start, end)
+    logger.info(f"Shard fetch complete: offsets {start}–{end} → {len(servers):,} servers")
+    return servers
+
+
 @task(name="transform-servers", tags=["transform"])
 def transform_servers(raw: list[dict]) -> list[dict]:
     """Normalise raw PulseMCP records into the site's internal MCPServer shape."""
@@ -262,16 +741,263 @@ def transform_servers(raw: list[dict]) -> list[dict]:
     return servers
 
 
+# ---------------------------------------------------------------------------
+# Tasks — run history & trending
+# ---------------------------------------------------------------------------
+
+@task(name="compute-trending", tags=["history", "transform"])
+def compute_trending(servers: list[dict]) -> list[dict]:
+    """Annotate servers with star/download deltas against stored snapshots.
+
+    For each window in TRENDING_WINDOWS the baseline is the newest snapshot at
+    least that many days old; windows without one are skipped.  Servers that
+    existed at the baseline get ``fields.trending`` with per-window deltas and
+    star/download growth rates, plus a ``rank`` ordered by the first available
+    window's star delta (download delta breaks ties).
+
+    Servers missing from that baseline have no delta to rank by, so they are
+    ranked separately as ``{"new": True, "new_rank": …}`` by current stars,
+    then downloads.
+
+    Servers whose ``_history_key`` occurs more than once (today or in a
+    baseline) can't be matched to their own history and get no trending
+    data at all.  Baselines coded against an older dictionary generation are
+    skipped.
+    """
+    logger    = get_run_logger()
+    index     = _load_history_index()
+    current   = _encode_snapshot(servers, index)
+    size      = len(index["ids"])
+    today     = datetime.now(timezone.utc).date()
+    snapshots = _history_snapshots()
+
+    cur_stars = _dense(current, "stars", size)
+    cur_dl    = _dense(current, "downloads", size)
+    ambiguous = _duplicated(current["id_code"], size)
+
+    windows: dict[int, dict[str, np.ndarray]] = {}
+    for days in TRENDING_WINDOWS:
+        cutoff   = today - timedelta(days=days)
+        eligible = [path for day, path in snapshots if day <= cutoff]
+        if not eligible:
+            logger.info(f"No snapshot ≥ {days} days old — skipping {days}d window")
+            continue
+
+        baseline = _load_snapshot(eligible[-1])
+        if _snapshot_generation(baseline) != index.get("generation", 0):
+            logger.warning(f"{eligible[-1].name} predates index.json — skipping {days}d window")
+            continue
+
+        prev_stars = _dense(baseline, "stars", size)
+        prev_dl    = _dense(baseline, "downloads", size)
+        ambiguous |= _duplicated(baseline["id_code"], size)
+        present    = (prev_stars >= 0) & (cur_stars >= 0)
+
+        d_stars = np.where(present, cur_stars - prev_stars, 0)
+        d_dl    = np.where(present, cur_dl - prev_dl, 0)
+        windows[days] = {
+            "present":          present,
+            "stars":            d_stars,
+            "downloads":        d_dl,
+            "growth_stars":     np.where(present, d_stars / np.maximum(prev_stars, 1), 0.0),
+            "growth_downloads": np.where(present, d_dl / np.maximum(prev_dl, 1), 0.0),
+        }
+        logger.info(f"{days}d window vs {eligible[-1].name}: {int(present.sum()):,} servers comparable")
+
+    if not windows:
+        return servers
+
+    for w in windows.values():
+        w["present"] = w["present"] & ~ambiguous
+    skipped = int(np.isin(current["id_code"], np.flatnonzero(ambiguous)).sum())
+    if skipped:
+        logger.warning(f"{skipped:,} servers share a history key — no trending data for them")
+
+    primary  = windows[min(windows)]
+    rank     = _trending_rank(primary["present"], primary["stars"], primary["downloads"])
+    new_rank = _trending_rank(~primary["present"] & ~ambiguous & (cur_stars >= 0), cur_stars, cur_dl)
+
+    columns = {
+        days: {key: arr.tolist() for key, arr in w.items()}
+        for days, w in windows.items()
+    }
+    rank_list     = rank.tolist()
+    new_rank_list = new_rank.tolist()
+
+    for server, code in zip(servers, current["id_code"].tolist()):
+        trending: dict[str, Any] = {}
+        for days, w in columns.items():
+            if w["present"][code]:
+                trending[f"stars_{days}d"]     = w["stars"][code]
+                trending[f"downloads_{days}d"] = w["downloads"][code]
+                trending[f"growth_stars_{days}d"]     = round(w["growth_stars"][code], 4)
+                trending[f"growth_downloads_{days}d"] = round(w["growth_downloads"][code], 4)
+        if trending:
+            trending["rank"] = rank_list[code] or None
+        elif new_rank_list[code]:
+            trending = {"new": True, "new_rank": new_rank_list[code]}
+        if trending:
+            server["fields"]["trending"] = trending
+
+    logger.info(
+        f"Trending computed for {int(rank.astype(bool).sum()):,} servers "
+        f"(+{int(new_rank.astype(bool).sum()):,} new)  windows={sorted(windows)}"
+    )
+    return servers
+
+
+@task(name="record-history-snapshot", tags=["history", "io"])
+def record_history_snapshot(servers: list[dict]) -> Path:
+    """Append today's columnar snapshot to the run-history store.
+
+    Re-running on the same UTC day replaces that day's snapshot, then the
+    retention policy is applied and, if it removed anything, the key
+    dictionary is compacted to the keys the kept snapshots still use.
+    """
+    logger = get_run_logger()
+    index  = _load_history_index()
+    arrays = _encode_snapshot(servers, index)
+    today  = datetime.now(timezone.utc).date()
+    arrays["generation"] = np.int64(index.get("generation", 0))
+
+    _save_history_index(index)
+    path = HISTORY_DIR / f"{today.isoformat()}.npz"
+    _save_snapshot(path, arrays)
+
+    removed = _apply_history_retention(today)
+    dropped = _compact_history_index() if removed else 0
+    size_kb = path.stat().st_size / 1024
+    logger.info(
+        f"History snapshot → {path}  ({size_kb:.1f} KB)  "
+        f"retention removed {len(removed)} snapshot(s), {dropped:,} key(s)"
+    )
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Tasks — prebuilt related-servers table
+# ---------------------------------------------------------------------------
+
+@task(name="compute-related-servers", tags=["transform"])
+def compute_related_servers(servers: list[dict], k: int = RELATED_TOP_K) -> dict:
+    """Build the related-servers payload: the effective ``k`` and, per server
+    id, its most similar servers (see ``_related_top_k``)."""
+    logger  = get_run_logger()
+    k       = max(0, min(k, len(servers) - 1))
+    related = _related_top_k(servers, k)
+    logger.info(f"Related servers computed for {len(related):,}/{len(servers):,} servers  (k={k})")
+    return {"k": k, "related": related}
+
+
+@task(name="write-related-servers", tags=["io"])
+def write_related_servers(payload: dict, generated_at: str) -> Path:
+    """Write related-servers.json next to servers.json.
+
+    ``generated_at`` must be the value written into servers.json: the server
+    page only trusts the table when the two match, which guarantees its ids
+    belong to the catalogue being rendered.
+    """
+    logger = get_run_logger()
+    _write_json_atomic(RELATED_PATH, {"generated_at": generated_at, **payload})
+    logger.info(f"Wrote {RELATED_PATH}  ({RELATED_PATH.stat().st_size / 1024:.1f} KB)")
+    return RELATED_PATH
+
+
+# ---------------------------------------------------------------------------
+# Tasks — shard exchange
+# ---------------------------------------------------------------------------
+
+@task(name="write-shard", tags=["shard", "io"])
+def write_shard(shard_dir: str, start: int, end: int, overlap: int, servers: list[dict]) -> Path:
+    """Write one shard's raw PulseMCP records to <shard_dir>/shard-<start>.json."""
+    logger = get_run_logger()
+    path   = _shard_path(Path(shard_dir), start)
+    _write_json_atomic(path, {
+        "start":   start,
+        "end":     end,
+        "overlap": overlap,
+        "count":   len(servers),
+        "servers": servers,
+    })
+    logger.info(f"Wrote shard {start}–{end}+{overlap}: {len(servers):,} servers → {path}")
+    return path
+
+
+@task(name="merge-shards", tags=["shard", "io"])
+def merge_shards(shard_dir: str, ranges: list[tuple[int, int, int]], max_servers: int) -> list[dict]:
+    """Concatenate raw shard records in offset order, dropping boundary duplicates.
+
+    Shards fetch at slightly different times, so a record can slide across a
+    shard boundary: sliding forward it appears at the head of the next shard
+    too, sliding back it is only caught by the previous shard's overlap.
+    Duplicates are therefore looked for only where shards overlap — the last
+    ``overlap`` records of a shard's own range plus its overlap tail against
+    the next shard's first ``2 × overlap`` — matched on ``_raw_key``, one
+    drop per matching copy.  Distinct servers that merely share a name (and
+    so a derived id) elsewhere in the catalogue are kept, as in the
+    single-worker flow.  The result is trimmed to max_servers.
+
+    A shard that came back short while a later one didn't means offsets
+    moved by more than the overlap, so that is logged as a warning.  Raises
+    if any expected shard file is missing.
+    """
+    logger  = get_run_logger()
+    paths   = [_shard_path(Path(shard_dir), start) for start, _, _ in ranges]
+    missing = [p.name for p in paths if not p.exists()]
+    if missing:
+        raise RuntimeError(f"{len(missing)} shard file(s) missing: {', '.join(missing[:10])}")
+
+    shards = [json.loads(path.read_text()) for path in paths]
+
+    servers: list[dict] = []
+    dropped = 0
+    for i, shard in enumerate(shards):
+        records = shard["servers"]
+        if i > 0:
+            prev    = shards[i - 1]
+            overlap = prev.get("overlap", 0)
+            owned   = prev["end"] - prev["start"]
+            tail    = Counter(_raw_key(r) for r in prev["servers"][max(0, owned - overlap):])
+            head: list[dict] = []
+            for record in records[:2 * overlap]:
+                key = _raw_key(record)
+                if tail[key]:
+                    tail[key] -= 1
+                    dropped   += 1
+                else:
+                    head.append(record)
+            records = head + records[2 * overlap:]
+        servers.extend(records)
+
+        expected = shard["end"] - shard["start"] + shard.get("overlap", 0)
+        if shard["count"] < expected and any(later["count"] for later in shards[i + 1:]):
+            logger.warning(
+                f"Shard {shard['start']}–{shard['end']} returned {shard['count']:,} of "
+                f"{expected:,} servers but later shards did not end early — "
+                f"servers near offset {shard['start'] + shard['count']} may be missing"
+            )
+
+    merged  = len(servers)
+    servers = servers[:max_servers]
+    logger.info(
+        f"Merged {len(paths)} shard(s): {len(servers):,} servers  "
+        f"({dropped:,} boundary duplicate(s) dropped, {merged - len(servers):,} over max_servers)"
+    )
+    return servers
+
+
 # ---------------------------------------------------------------------------
 # Tasks — Prefect Artifacts (dashboard visibility)
 # ---------------------------------------------------------------------------
 
 @task(name="publish-artifacts", tags=["observability"])
 def publish_artifacts(servers: list[dict], elapsed_seconds: float) -> None:
-    """Publish three artifacts visible in the Prefect UI:
+    """Publish up to four artifacts visible in the Prefect UI:
       1. category-breakdown  — table of server counts by category
       2. top-10-by-stars     — table of the most-starred servers
-      3. run-summary         — markdown overview of the entire run
+      3. top-20-trending     — table of the highest trending ranks
+                               (only once the history store has a baseline)
+      4. run-summary         — markdown overview of the entire run
     """
     logger = get_run_logger()
     total  = len(servers)
@@ -314,7 +1040,37 @@ def publish_artifacts(servers: list[dict], elapsed_seconds: float) -> None:
     )
     logger.info("Published artifact: top-10-by-stars")
 
-    # ── 3. Markdown run summary ──────────────────────────────────────────────
+    # ── 3. Top-20 trending ───────────────────────────────────────────────────
+    top_trending = sorted(
+        (s for s in servers if (s["fields"].get("trending") or {}).get("rank")),
+        key=lambda s: s["fields"]["trending"]["rank"],
+    )[:20]
+
+    if top_trending:
+        create_table_artifact(
+            key="top-20-trending",
+            table=[
+                {
+                    "Rank":       str(s["fields"]["trending"]["rank"]),
+                    "Server":     s["fields"]["name"],
+                    "Stars":      str(s["fields"].get("stars") or 0),
+                    **{
+                        f"Δ Stars {days}d": str(s["fields"]["trending"].get(f"stars_{days}d", "—"))
+                        for days in TRENDING_WINDOWS
+                    },
+                    **{
+                        f"Δ Downloads {days}d": str(s["fields"]["trending"].get(f"downloads_{days}d", "—"))
+                        for days in TRENDING_WINDOWS
+                    },
+                    "Category":   s["fields"]["category"],
+                }
+                for s in top_trending
+            ],
+            description="Top 20 servers by trending rank (star delta, then download delta)",
+        )
+        logger.info("Published artifact: top-20-trending")
+
+    # ── 4. Markdown run summary ──────────────────────────────────────────────
     category_rows = "\n".join(
         f"| {cat:<28} | {cnt:>7,} | {cnt / total * 100:>6.1f}% |"
         for cat, cnt in counts.most_common()
@@ -323,6 +1079,11 @@ def publish_artifacts(servers: list[dict], elapsed_seconds: float) -> None:
         f"| {s['fields']['name']:<42} | {s['fields'].get('stars') or 0:>7,} |"
         for s in top10
     )
+    trending_rows = "\n".join(
+        f"| {s['fields']['trending']['rank']:>4} | {s['fields']['name']:<42} | "
+        f"{s['fields']['trending'].get(f'stars_{TRENDING_WINDOWS[0]}d', 0):>+7,} |"
+        for s in top_trending[:10]
+    ) or "| — | No history baseline yet | — |"
 
     markdown = f"""\
 # MCP Server Data Refresh — Run Summary
@@ -349,6 +1110,14 @@ def publish_artifacts(servers: list[dict], elapsed_seconds: float) -> None:
 | Server                                     |   Stars |
 |--------------------------------------------|--------:|
 {stars_rows}
+
+---
+
+## Top 10 Trending
+
+| Rank | Server                                     | Δ Stars {TRENDING_WINDOWS[0]}d |
+|-----:|--------------------------------------------|---------:|
+{trending_rows}
 """
 
     create_markdown_artifact(
@@ -364,13 +1133,13 @@ def publish_artifacts(servers: list[dict], elapsed_seconds: float) -> None:
 # ---------------------------------------------------------------------------
 
 @task(name="write-servers-json", tags=["io"])
-def write_servers_json(servers: list[dict]) -> Path:
+def write_servers_json(servers: list[dict], generated_at: str | None = None) -> Path:
     """Write the transformed server list to src/data/servers.json."""
     logger = get_run_logger()
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     payload = {
-        "generated_at": _now(),
+        "generated_at": generated_at or _now(),
         "count":        len(servers),
         "servers":      servers,
     }
@@ -583,6 +1352,87 @@ def notify_slack(
 # Flow
 # ---------------------------------------------------------------------------
 
+def _publish_catalogue(servers: list[dict], started: datetime, dry_run: bool) -> None:
+    """Everything after transform, shared by the single-worker and sharded flows."""
+    logger = get_run_logger()
+
+    # 2b ── Trending vs run history (non-fatal) ──────────────────────────
+    try:
+        servers = compute_trending(servers)
+    except Exception as exc:
+        logger.warning(f"Trending computation failed (non-fatal): {exc}")
+
+    # 3 ── Artifacts (non-fatal: failure doesn't abort the flow) ────────
+    try:
+        elapsed_so_far = (datetime.now(timezone.utc) - started).total_seconds()
+        publish_artifacts(servers, elapsed_so_far)
+    except Exception as exc:
+        logger.warning(f"Artifact publishing failed (non-fatal): {exc}")
+
+    # 4 ── Write ────────────────────────────────────────────────────────
+    generated_at = _now()
+    write_servers_json(servers, generated_at)
+
+    # 4a ── Prebuilt related-servers table (non-fatal) ───────────────────
+    # The server page falls back to scanning the catalogue without it.
+    try:
+        write_related_servers(compute_related_servers(servers), generated_at)
+    except Exception as exc:
+        logger.warning(f"Related-servers build failed (non-fatal): {exc}")
+
+    # 4b ── Run-history snapshot (non-fatal) ─────────────────────────────
+    # Dry runs fetch a partial catalogue, so they must not become a baseline.
+    if not dry_run:
+        try:
+            record_history_snapshot(servers)
+        except Exception as exc:
+            logger.warning(f"History snapshot failed (non-fatal): {exc}")
+    else:
+        logger.info("dry_run=True — skipping run-history snapshot")
+
+    # 5 ── D1 database write ──────────────────────────────────────────────
+    if not dry_run:
+        write_to_d1(servers)
+    else:
+        logger.info("dry_run=True — skipping D1 database write")
+
+    # 6 ── Cloudflare rebuild ────────────────────────────────────────────
+    if not dry_run:
+        trigger_cloudflare_rebuild()
+    else:
+        logger.info("dry_run=True — skipping Cloudflare rebuild trigger")
+
+
+def _finish_run(servers: list[dict], started: datetime, notify: bool, **extra: Any) -> dict:
+    """Build the flow result, log it and post the Slack success summary."""
+    logger  = get_run_logger()
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    result  = {
+        "success":         True,
+        "servers_written": len(servers),
+        **extra,
+        "elapsed_seconds": round(elapsed, 1),
+        "generated_at":    _now(),
+    }
+    logger.info(f"Flow complete: {result}")
+
+    if notify:
+        notify_slack(len(servers), "D1_WRITE", elapsed, success=True)
+
+    return result
+
+
+def _report_failure(exc: Exception, started: datetime, notify: bool) -> None:
+    """Log a flow failure and post the Slack failure notice; caller re-raises."""
+    logger    = get_run_logger()
+    error_msg = str(exc)
+    elapsed   = (datetime.now(timezone.utc) - started).total_seconds()
+    logger.error(f"Flow failed after {elapsed:.1f}s: {error_msg}")
+
+    if notify:
+        notify_slack(0, "", elapsed, success=False, error_msg=error_msg)
+
+
 @flow(
     name="refresh-mcp-server-data",
     description=(
@@ -627,52 +1477,120 @@ def refresh_server_data(
         # 2 ── Transform ────────────────────────────────────────────────────
         servers = transform_servers(raw_servers)
 
-        # 3 ── Artifacts (non-fatal: failure doesn't abort the flow) ────────
-        try:
-            elapsed_so_far = (datetime.now(timezone.utc) - started).total_seconds()
-            publish_artifacts(servers, elapsed_so_far)
-        except Exception as exc:
-            logger.warning(f"Artifact publishing failed (non-fatal): {exc}")
+        # 2b–6 ── Trending, artifacts, write, D1, Cloudflare ────────────────
+        _publish_catalogue(servers, started, dry_run)
 
-        # 4 ── Write ────────────────────────────────────────────────────────
-        path = write_servers_json(servers)
+        # 7 ── Wrap up + notify ──────────────────────────────────────────────
+        return _finish_run(servers, started, notify)
 
-        # 5 ── D1 database write ──────────────────────────────────────────────
-        if not dry_run:
-            write_to_d1(servers)
-        else:
-            logger.info("dry_run=True — skipping D1 database write")
+    except Exception as exc:
+        _report_failure(exc, started, notify)
+        raise   # re-raise so Prefect marks the run as FAILED
 
-        # 6 ── Cloudflare rebuild ────────────────────────────────────────────
-        if not dry_run:
-            trigger_cloudflare_rebuild()
+
+@flow(
+    name="refresh-mcp-shard",
+    description=(
+        "One shard of the sharded refresh: fetch a PulseMCP offset range "
+        "and write the raw records as a shard file for the coordinator."
+    ),
+    log_prints=True,
+    timeout_seconds=1_800,
+)
+def refresh_shard(start: int, end: int, shard_dir: str, overlap: int = 0) -> dict:
+    """
+    Parameters
+    ----------
+    start, end : int
+        Half-open PulseMCP offset range [start, end) owned by this shard.
+    shard_dir : str
+        Directory the coordinator merges from; must be reachable by both.
+    overlap : int
+        Extra offsets to read past ``end`` so servers that slide back across
+        the boundary before the next shard fetches aren't lost.
+    """
+    raw  = fetch_server_range(start, end + overlap)
+    path = write_shard(shard_dir, start, end, overlap, raw)
+    return {"start": start, "end": end, "overlap": overlap, "count": len(raw), "path": str(path)}
+
+
+@flow(
+    name="refresh-mcp-server-data-sharded",
+    description=(
+        "Sharded pipeline: split the PulseMCP offset range into shards, run "
+        "them as subflows or deployment runs across the work pool, merge the "
+        "shard files, then publish once like refresh-mcp-server-data."
+    ),
+    log_prints=True,
+    timeout_seconds=3_600,   # hard ceiling: 1 hour
+)
+def refresh_server_data_sharded(
+    max_servers: int  = int(os.getenv("PULSEMCP_MAX_SERVERS", "5000")),
+    shard_size:  int  = SHARD_SIZE,
+    dispatch:    str  = "subflow",
+    dry_run:     bool = False,
+    notify:      bool = True,
+) -> dict:
+    """
+    Parameters
+    ----------
+    max_servers : int
+        Maximum servers to fetch from PulseMCP.  Default 5 000.
+    shard_size : int
+        PulseMCP offsets per shard.  Default REFRESH_SHARD_SIZE (1 000).
+    dispatch : str
+        "subflow"    — run shards in this process, one after another.
+        "deployment" — start a SHARD_DEPLOYMENT run per shard so any worker
+                       in the pool can take it; REFRESH_SHARD_DIR must then
+                       be shared between the workers.
+    dry_run : bool
+        Same as refresh_server_data: skip D1, Cloudflare and history writes.
+    notify : bool
+        Post a Slack summary on completion (success or failure).
+    """
+    logger    = get_run_logger()
+    started   = datetime.now(timezone.utc)
+    shard_dir = SHARD_ROOT / flow_run.id   # unique even for concurrent coordinators
+
+    try:
+        if dispatch not in ("subflow", "deployment"):
+            raise ValueError(f"dispatch must be 'subflow' or 'deployment', got {dispatch!r}")
+        if shard_size <= 0:
+            raise ValueError(f"shard_size must be positive, got {shard_size}")
+
+        ranges = _shard_ranges(max_servers, shard_size, SHARD_OVERLAP)
+        logger.info(
+            f"=== refresh-mcp-server-data-sharded  max_servers={max_servers}  "
+            f"shards={len(ranges)}×{shard_size}(+{SHARD_OVERLAP})  dispatch={dispatch}  "
+            f"dry_run={dry_run}  notify={notify} ==="
+        )
+
+        # 1 ── Fan out: fetch per shard ─────────────────────────────────────
+        if dispatch == "deployment":
+            _dispatch_shard_deployments(str(shard_dir), ranges)
         else:
-            logger.info("dry_run=True — skipping Cloudflare rebuild trigger")
-
-        # ── Wrap up ─────────────────────────────────────────────────────────
-        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
-        result  = {
-            "success":         True,
-            "servers_written": len(servers),
-            "elapsed_seconds": round(elapsed, 1),
-            "generated_at":    _now(),
-        }
-        logger.info(f"Flow complete: {result}")
+            for start, end, overlap in ranges:
+                refresh_shard(start, end, str(shard_dir), overlap)
 
-        # 7 ── Notify ────────────────────────────────────────────────────────
-        if notify:
-            notify_slack(len(servers), "D1_WRITE", elapsed, success=True)
+        # 2 ── Gather + transform ───────────────────────────────────────────
+        # Transforming the merged list (not per shard) keeps ids — including
+        # positional fallback ids — identical to the single-worker flow.
+        raw_servers = merge_shards(str(shard_dir), ranges, max_servers)
+        if not raw_servers:
+            raise ValueError("Shards returned 0 servers — aborting")
+        servers = transform_servers(raw_servers)
 
-        return result
+        # 2b–6 ── Publish once ───────────────────────────────────────────────
+        _publish_catalogue(servers, started, dry_run)
 
-    except Exception as exc:
-        error_msg = str(exc)
-        elapsed   = (datetime.now(timezone.utc) - started).total_seconds()
-        logger.error(f"Flow failed after {elapsed:.1f}s: {error_msg}")
+        # Shard files are left behind on failure for inspection.
+        shutil.rmtree(shard_dir, ignore_errors=True)
 
-        if notify:
-            notify_slack(0, "", elapsed, success=False, error_msg=error_msg)
+        # 7 ── Wrap up + notify ──────────────────────────────────────────────
+        return _finish_run(servers, started, notify, shards=len(ranges))
 
+    except Exception as exc:
+        _report_failure(exc, started, notify)
         raise   # re-raise so Prefect marks the run as FAILED
 
 
@@ -696,11 +1614,32 @@ if __name__ == "__main__":
         "--no-notify", action="store_true",
         help="Suppress the Slack notification",
     )
+    parser.add_argument(
+        "--sharded", action="store_true",
+        help="Run the sharded coordinator flow instead of the single-worker flow",
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=SHARD_SIZE,
+        help=f"Offsets per shard in --sharded mode (default: {SHARD_SIZE})",
+    )
+    parser.add_argument(
+        "--dispatch", choices=("subflow", "deployment"), default="subflow",
+        help="How --sharded runs shards: in-process subflows or deployment runs",
+    )
     args = parser.parse_args()
 
-    result = refresh_server_data(
-        max_servers=args.max_servers,
-        dry_run=args.dry_run,
-        notify=not args.no_notify,
-    )
+    if args.sharded:
+        result = refresh_server_data_sharded(
+            max_servers=args.max_servers,
+            shard_size=args.shard_size,
+            dispatch=args.dispatch,
+            dry_run=args.dry_run,
+            notify=not args.no_notify,
+        )
+    else:
+        result = refresh_server_data(
+            max_servers=args.max_servers,
+            dry_run=args.dry_run,
+            notify=not args.no_notify,
+        )
     print(json.dumps(result, indent=2))
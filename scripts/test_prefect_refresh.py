@@ -0,0 +1,435 @@
+"""
+Unit tests for the pure helpers in prefect_refresh.py.
+
+Run:  python -m pytest scripts/test_prefect_refresh.py
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import prefect_refresh as pr
+
+
+def _server(
+    server_id: str,
+    stars: int = 0,
+    downloads: int = 0,
+    category: str = "development",
+    github_url: str = "#",
+) -> dict:
+    return {
+        "id": server_id,
+        "fields": {"stars": stars, "downloads": downloads, "category": category, "github_url": github_url},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Run-history store
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def history_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pr, "HISTORY_DIR", tmp_path)
+    return tmp_path
+
+
+def test_encode_snapshot_assigns_stable_dictionary_codes():
+    index = {"ids": ["b\t#"], "categories": ["cloud"]}
+    arrays = pr._encode_snapshot(
+        [_server("a", 3, 30, "search"), _server("b", 5, 50, "cloud"), _server("c")],
+        index,
+    )
+
+    assert index == {"ids": ["b\t#", "a\t#", "c\t#"], "categories": ["cloud", "search", "development"]}
+    assert arrays["id_code"].tolist() == [1, 0, 2]
+    assert arrays["category_code"].tolist() == [1, 0, 2]
+    assert arrays["stars"].tolist() == [3, 5, 0]
+    assert arrays["downloads"].tolist() == [30, 50, 0]
+
+
+def test_dense_marks_absent_ids():
+    snapshot = {"id_code": np.array([2, 0]), "stars": np.array([7, 9])}
+    assert pr._dense(snapshot, "stars", 4).tolist() == [9, -1, 7, -1]
+
+
+def test_retention_keeps_daily_then_one_per_week(history_dir):
+    today = date(2026, 10, 19)
+    for age in range(0, 450):
+        (history_dir / f"{(today - timedelta(days=age)).isoformat()}.npz").touch()
+    (history_dir / "index.json").touch()
+
+    removed = pr._apply_history_retention(today)
+    kept    = [(today - day).days for day, _ in pr._history_snapshots()]
+
+    assert kept[-(pr.HISTORY_DAILY_DAYS + 1):] == list(range(pr.HISTORY_DAILY_DAYS, -1, -1))
+    older = [day for day, _ in pr._history_snapshots() if (today - day).days > pr.HISTORY_DAILY_DAYS]
+    weeks = [tuple(day.isocalendar())[:2] for day in older]
+    assert len(weeks) == len(set(weeks))
+    assert max(kept) <= pr.HISTORY_WEEKLY_DAYS
+    assert len(removed) + len(kept) == 450
+    assert (history_dir / "index.json").exists()
+
+
+def test_retention_is_idempotent(history_dir):
+    today = date(2026, 10, 19)
+    for age in range(0, 100, 2):
+        (history_dir / f"{(today - timedelta(days=age)).isoformat()}.npz").touch()
+
+    pr._apply_history_retention(today)
+    assert pr._apply_history_retention(today) == []
+
+
+def _store(servers: list[dict], day: date) -> None:
+    index  = pr._load_history_index()
+    arrays = pr._encode_snapshot(servers, index)
+    arrays["generation"] = np.int64(index["generation"])
+    pr._save_history_index(index)
+    pr._save_snapshot(pr.HISTORY_DIR / f"{day.isoformat()}.npz", arrays)
+
+
+def _decoded(path) -> list[str]:
+    ids = pr._load_history_index()["ids"]
+    return [ids[code] for code in pr._load_snapshot(path)["id_code"].tolist()]
+
+
+def test_compaction_drops_keys_no_snapshot_uses(history_dir):
+    today = date(2026, 10, 19)
+    _store([_server("kept"), _server("pulsemcp-1")], today - timedelta(days=2))
+    _store([_server("kept"), _server("pulsemcp-2")], today - timedelta(days=1))
+    _store([_server("pulsemcp-3"), _server("kept")], today)
+    (history_dir / f"{(today - timedelta(days=2)).isoformat()}.npz").unlink()
+
+    assert pr._compact_history_index() == 1
+    index = pr._load_history_index()
+    assert index == {"generation": 1, "ids": ["kept\t#", "pulsemcp-2\t#", "pulsemcp-3\t#"], "categories": ["development"]}
+    paths = [path for _, path in pr._history_snapshots()]
+    assert [_decoded(path) for path in paths] == [["kept\t#", "pulsemcp-2\t#"], ["pulsemcp-3\t#", "kept\t#"]]
+    assert pr._compact_history_index() == 0
+
+
+def test_compaction_deletes_snapshots_from_another_generation(history_dir):
+    today = date(2026, 10, 19)
+    _store([_server("a")], today - timedelta(days=1))
+    _store([_server("b")], today)
+    stale = pr._load_snapshot(history_dir / f"{today.isoformat()}.npz")
+    pr._save_snapshot(history_dir / f"{today.isoformat()}.npz", {**stale, "generation": np.int64(7)})
+
+    assert pr._compact_history_index() == 1
+    assert [day for day, _ in pr._history_snapshots()] == [today - timedelta(days=1)]
+    assert pr._load_history_index()["ids"] == ["a\t#"]
+
+
+# ---------------------------------------------------------------------------
+# Trending
+# ---------------------------------------------------------------------------
+
+def test_trending_separates_same_name_servers_and_skips_ambiguous(history_dir, quiet_logger, caplog):
+    week_ago = datetime.now(timezone.utc).date() - timedelta(days=7)
+    _store([
+        _server("github", 10, github_url="https://github.com/a/x"),
+        _server("github", 500, github_url="https://github.com/b/y"),
+        _server("twin", 1),
+        _server("twin", 2),
+    ], week_ago)
+
+    servers = [
+        _server("github", 15, github_url="https://github.com/a/x"),
+        _server("github", 520, github_url="https://github.com/b/y"),
+        _server("twin", 9),
+        _server("twin", 9),
+    ]
+    with caplog.at_level(logging.WARNING, logger=quiet_logger.name):
+        pr.compute_trending.fn(servers)
+
+    trending = [s["fields"].get("trending") for s in servers]
+    assert [t["stars_7d"] for t in trending[:2]] == [5, 20]
+    assert [t["rank"] for t in trending[:2]] == [2, 1]
+    assert trending[2:] == [None, None]
+    assert "2 servers share a history key" in caplog.text
+
+
+def test_trending_skips_baseline_from_another_generation(history_dir, quiet_logger):
+    week_ago = datetime.now(timezone.utc).date() - timedelta(days=7)
+    _store([_server("a", 1)], week_ago)
+    path = history_dir / f"{week_ago.isoformat()}.npz"
+    pr._save_snapshot(path, {**pr._load_snapshot(path), "generation": np.int64(3)})
+
+    servers = [_server("a", 5)]
+    pr.compute_trending.fn(servers)
+    assert "trending" not in servers[0]["fields"]
+
+
+# ---------------------------------------------------------------------------
+# Trending rank
+# ---------------------------------------------------------------------------
+
+def test_trending_rank_orders_by_primary_then_secondary():
+    eligible  = np.array([True, True, False, True, True])
+    primary   = np.array([5, 9, 100, 5, -2])
+    secondary = np.array([1, 0, 100, 8, 50])
+
+    assert pr._trending_rank(eligible, primary, secondary).tolist() == [3, 1, 0, 2, 4]
+
+
+def test_trending_rank_with_nothing_eligible():
+    rank = pr._trending_rank(np.zeros(3, dtype=bool), np.arange(3), np.arange(3))
+    assert rank.tolist() == [0, 0, 0]
+
+
+# ---------------------------------------------------------------------------
+# Related servers
+# ---------------------------------------------------------------------------
+
+def _described(server_id: str, name: str, description: str, category: str = "databases") -> dict:
+    return {
+        "id": server_id,
+        "fields": {"name": name, "description": description, "category": category},
+    }
+
+
+def test_related_links_identical_servers():
+    servers = [_described(f"s{i}", "Postgres Explorer", "query postgres tables") for i in range(4)]
+    related = pr._related_top_k(servers, 5)
+
+    assert related == {
+        f"s{i}": [f"s{j}" for j in range(4) if j != i]
+        for i in range(4)
+    }
+
+
+def test_related_prefers_rare_shared_terms():
+    servers = [
+        _described("pg",    "Postgres Inspector", "inspect postgres schemas"),
+        _described("pg2",   "Postgres Migrator",  "migrate postgres schemas"),
+        _described("slack", "Slack Notifier",     "post messages",   "communication"),
+        _described("mail",  "Mail Notifier",      "send messages",   "communication"),
+    ]
+    related = pr._related_top_k(servers, 1)
+
+    assert related == {"pg": ["pg2"], "pg2": ["pg"], "slack": ["mail"], "mail": ["slack"]}
+
+
+def test_related_skips_servers_without_shared_terms():
+    servers = [
+        _described("a", "Alpha", "zebra",  "one"),
+        _described("b", "Bravo", "yak",    "two"),
+        _described("c", "Charlie", "zebra", "three"),
+    ]
+    assert pr._related_top_k(servers, 5) == {"a": ["c"], "c": ["a"]}
+
+
+def test_related_needs_two_servers():
+    assert pr._related_top_k([_described("a", "Alpha", "zebra")], 5) == {}
+
+
+@pytest.mark.parametrize("dense_df, cells, pairs", [(1, 7, 1), (2, 40, 3), (10**9, 10**9, 10**9)])
+def test_related_independent_of_dense_split_and_block_size(monkeypatch, dense_df, cells, pairs):
+    words   = ["postgres", "slack", "github", "search", "files", "browser", "weather", "notion"]
+    servers = [
+        _described(
+            f"s{i}",
+            f"{words[i % 8].title()} {words[(i * 3) % 8].title()}",
+            " ".join(words[(i * j) % 8] for j in range(1, 4)),
+            ("databases", "communication", "development")[i % 3],
+        )
+        for i in range(30)
+    ]
+    expected = pr._related_top_k(servers, 5)
+
+    monkeypatch.setattr(pr, "RELATED_DENSE_DF", dense_df)
+    monkeypatch.setattr(pr, "RELATED_BLOCK_CELLS", cells)
+    monkeypatch.setattr(pr, "RELATED_BLOCK_PAIRS", pairs)
+    actual = pr._related_top_k(servers, 5)
+
+    assert {sid: set(ids) for sid, ids in actual.items()} == {sid: set(ids) for sid, ids in expected.items()}
+
+
+# ---------------------------------------------------------------------------
+# Sharded refresh
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def quiet_logger(monkeypatch):
+    logger = logging.getLogger("prefect_refresh.test")
+    monkeypatch.setattr(pr, "get_run_logger", lambda: logger)
+    return logger
+
+
+def test_shard_ranges_overlap_all_but_last():
+    assert pr._shard_ranges(2500, 1000, 50) == [(0, 1000, 50), (1000, 2000, 50), (2000, 2500, 0)]
+    assert pr._shard_ranges(2000, 1000, 50) == [(0, 1000, 50), (1000, 2000, 0)]
+
+
+def _raw(name: str, url: str | None = None) -> dict:
+    return {"name": name, "source_code_url": url if url is not None else f"https://github.com/{name}/{name}"}
+
+
+def _write_shard_file(shard_dir, start, end, overlap, records):
+    records = [_raw(r) if isinstance(r, str) else r for r in records]
+    pr._write_json_atomic(pr._shard_path(shard_dir, start), {
+        "start": start, "end": end, "overlap": overlap,
+        "count": len(records), "servers": records,
+    })
+
+
+def test_merge_shards_recovers_servers_that_slid_back(tmp_path, quiet_logger):
+    # "d" sat at offset 3 when shard 0 fetched [0, 3+2), then "a" was removed
+    # and "d" slid to offset 2 before shard 1 fetched [3, 6) — only the
+    # overlap catches it.
+    _write_shard_file(tmp_path, 0, 3, 2, ["a", "b", "c", "d", "e"])
+    _write_shard_file(tmp_path, 3, 6, 0, ["e", "f", "g"])
+
+    merged = pr.merge_shards.fn(str(tmp_path), [(0, 3, 2), (3, 6, 0)], 6)
+    assert [r["name"] for r in merged] == ["a", "b", "c", "d", "e", "f"]
+
+
+def test_merge_shards_drops_servers_that_slid_forward(tmp_path, quiet_logger):
+    # "x" was inserted before shard 1 fetched, pushing "c" into its head.
+    _write_shard_file(tmp_path, 0, 3, 1, ["a", "b", "c", "d"])
+    _write_shard_file(tmp_path, 3, 6, 0, ["c", "d", "e"])
+
+    merged = pr.merge_shards.fn(str(tmp_path), [(0, 3, 1), (3, 6, 0)], 6)
+    assert [r["name"] for r in merged] == ["a", "b", "c", "d", "e"]
+
+
+def test_sharded_merge_keeps_same_name_servers_like_single_mode(tmp_path, quiet_logger):
+    raw = [
+        _raw("GitHub", "https://github.com/a/x"),
+        _raw("Other"),
+        _raw("GitHub", "https://github.com/b/y"),
+        _raw("Filler"),
+    ]
+    _write_shard_file(tmp_path, 0, 2, 1, raw[:3])
+    _write_shard_file(tmp_path, 2, 4, 0, raw[2:])
+
+    merged = pr.merge_shards.fn(str(tmp_path), [(0, 2, 1), (2, 4, 0)], 4)
+    single = pr.transform_servers.fn(raw)
+    sharded = pr.transform_servers.fn(merged)
+
+    assert [s["id"] for s in sharded] == [s["id"] for s in single] == ["github", "other", "github", "filler"]
+    assert [s["fields"]["github_url"] for s in sharded] == [s["fields"]["github_url"] for s in single]
+
+
+def test_sharded_merge_dedupes_nameless_records_across_boundary(tmp_path, quiet_logger):
+    # No name → positional fallback id; the raw key still matches, and ids
+    # are assigned after the merge so they follow merged positions.
+    nameless = {"source_code_url": "https://github.com/n/n"}
+    _write_shard_file(tmp_path, 0, 2, 1, ["a", "b", nameless])
+    _write_shard_file(tmp_path, 2, 4, 0, [nameless, "c"])
+
+    merged  = pr.merge_shards.fn(str(tmp_path), [(0, 2, 1), (2, 4, 0)], 4)
+    servers = pr.transform_servers.fn(merged)
+    assert [s["id"] for s in servers] == ["a", "b", "pulsemcp-2", "c"]
+
+
+def test_merge_shards_warns_on_short_shard(tmp_path, quiet_logger, caplog):
+    _write_shard_file(tmp_path, 0, 3, 1, ["a", "b"])
+    _write_shard_file(tmp_path, 3, 6, 0, ["d", "e", "f"])
+
+    with caplog.at_level(logging.WARNING, logger=quiet_logger.name):
+        pr.merge_shards.fn(str(tmp_path), [(0, 3, 1), (3, 6, 0)], 6)
+    assert "Shard 0–3 returned 2 of 4" in caplog.text
+
+
+def test_merge_shards_short_final_shard_is_end_of_catalogue(tmp_path, quiet_logger, caplog):
+    _write_shard_file(tmp_path, 0, 3, 1, ["a", "b", "c", "d"])
+    _write_shard_file(tmp_path, 3, 6, 0, ["d"])
+
+    with caplog.at_level(logging.WARNING, logger=quiet_logger.name):
+        merged = pr.merge_shards.fn(str(tmp_path), [(0, 3, 1), (3, 6, 0)], 6)
+    assert [r["name"] for r in merged] == ["a", "b", "c", "d"]
+    assert caplog.text == ""
+
+
+class _FakeState:
+    def __init__(self, name: str):
+        self.name = name
+
+    def is_final(self) -> bool:
+        return self.name in ("Completed", "Failed", "Crashed")
+
+    def is_completed(self) -> bool:
+        return self.name == "Completed"
+
+
+class _FakeClient:
+    """Stands in for get_client(sync_client=True); each run walks its states."""
+
+    def __init__(self, timelines: dict[str, list[str]]):
+        self.timelines = timelines
+        self.polls = {run_id: 0 for run_id in timelines}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read_flow_run(self, run_id):
+        states = self.timelines[run_id]
+        state  = states[min(self.polls[run_id], len(states) - 1)]
+        self.polls[run_id] += 1
+        return SimpleNamespace(id=run_id, name=f"shard-{run_id}", state=_FakeState(state))
+
+
+@pytest.fixture
+def fake_dispatch(monkeypatch, quiet_logger):
+    dispatched: list[dict] = []
+
+    def fake_run_deployment(name, parameters, timeout):
+        assert name == pr.SHARD_DEPLOYMENT and timeout == 0
+        dispatched.append(parameters)
+        run_id = str(parameters["start"])
+        return SimpleNamespace(id=run_id, name=f"shard-{run_id}")
+
+    def install(timelines: dict[str, list[str]]) -> _FakeClient:
+        client = _FakeClient(timelines)
+        monkeypatch.setattr(pr, "get_client", lambda sync_client: client)
+        return client
+
+    monkeypatch.setattr(pr, "run_deployment", fake_run_deployment)
+    monkeypatch.setattr(pr, "SHARD_POLL_SECS", 0)
+    return dispatched, install
+
+
+RANGES = [(0, 10, 2), (10, 20, 2), (20, 25, 0)]
+
+
+def test_dispatch_waits_for_every_shard(fake_dispatch):
+    dispatched, install = fake_dispatch
+    client = install({
+        "0":  ["Completed"],
+        "10": ["Scheduled", "Running", "Completed"],
+        "20": ["Pending", "Completed"],
+    })
+
+    pr._dispatch_shard_deployments("/shards/run", RANGES)
+
+    assert dispatched == [
+        {"start": s, "end": e, "shard_dir": "/shards/run", "overlap": o} for s, e, o in RANGES
+    ]
+    assert client.polls == {"0": 1, "10": 3, "20": 2}
+
+
+def test_dispatch_raises_on_failed_shard(fake_dispatch):
+    _, install = fake_dispatch
+    install({"0": ["Completed"], "10": ["Running", "Crashed"], "20": ["Failed"]})
+
+    with pytest.raises(RuntimeError, match=r"2 shard run\(s\) did not complete") as err:
+        pr._dispatch_shard_deployments("/shards/run", RANGES)
+    assert "shard-10 (Crashed)" in str(err.value) and "shard-20 (Failed)" in str(err.value)
+
+
+def test_dispatch_times_out_listing_pending_runs(fake_dispatch, monkeypatch):
+    _, install = fake_dispatch
+    install({"0": ["Completed"], "10": ["Scheduled"], "20": ["Late"]})
+    monkeypatch.setattr(pr, "SHARD_TIMEOUT_SECS", 0)
+
+    with pytest.raises(TimeoutError, match=r"2 shard run\(s\) still pending after 0s: shard-10, shard-20"):
+        pr._dispatch_shard_deployments("/shards/run", RANGES)
@@ -0,0 +1,82 @@
+/**
+ * search-engine.test.mjs — prebuilt search index vs. in-process corpus index.
+ * Run: node src/lib/search-engine.test.mjs
+ */
+import assert from 'node:assert/strict';
+import {
+  buildCorpusIndex,
+  buildSearchIndex,
+  corpusIndexFromSearchIndex,
+  searchServers,
+} from './search-engine.js';
+import { staticServers } from '../data/staticServers.js';
+
+let passed = 0;
+const test = (name, fn) => { fn(); passed++; console.log('  ✓', name); };
+
+const tiny = [
+  { id: 'pg', fields: { name: 'Postgres MCP', description: 'Query PostgreSQL databases (read-only).', author: '@acme' } },
+  { id: 'node', fields: { name: 'Node.js Runner', description: 'Run node.js-based scripts, e.g. v1.2 tools', author: '@x' } },
+  { id: 'proto', fields: { name: 'constructor __proto__', description: '', author: '' } },
+  { id: 'empty', fields: { name: '', description: '', author: '' } },
+];
+
+// Serialise the same way build-mcp-data.ts writes search-index.json.
+const roundTrip = (servers) => JSON.parse(JSON.stringify(buildSearchIndex(servers)));
+
+// ─── corpusIndexFromSearchIndex ─────────────────────────────────────────
+for (const [label, corpus] of [['tiny corpus', tiny], ['staticServers', staticServers]]) {
+  test(`same df/n as buildCorpusIndex on ${label}`, () => {
+    const expected = buildCorpusIndex(corpus);
+    const actual = corpusIndexFromSearchIndex(roundTrip(corpus));
+    assert.equal(actual.n, expected.n);
+    assert.deepEqual(new Map([...actual.df].sort()), new Map([...expected.df].sort()));
+  });
+}
+
+test('keeps ids in corpus order', () => {
+  assert.deepEqual(roundTrip(tiny).ids, ['pg', 'node', 'proto', 'empty']);
+});
+
+// ─── searchServers with postings ────────────────────────────────────────
+const strip = (r) => ({ total: r.total, hits: r.hits.map((h) => [h.server.id, h.score, h.reasons]) });
+const withPostings = corpusIndexFromSearchIndex(roundTrip(staticServers));
+const withoutPostings = buildCorpusIndex(staticServers);
+
+for (const query of [
+  'postgres',
+  'js',
+  'github issues and pull requests',
+  'headless browser automation',
+  'read postgres safely',
+  'slack',
+  'zzzz-nothing-matches',
+  'weather forecast',
+  'youtube transcript',
+  'obsidian vault',
+  '',
+]) {
+  test(`postings give identical results for "${query}"`, () => {
+    assert.deepEqual(
+      strip(searchServers(query, staticServers, { limit: 50, index: withPostings })),
+      strip(searchServers(query, staticServers, { limit: 50, index: withoutPostings })),
+    );
+  });
+}
+
+test('text-only queries score just the posting candidates', () => {
+  const index = corpusIndexFromSearchIndex(roundTrip(staticServers));
+  assert.ok(searchServers('weather', staticServers, { index }).total > 0);
+  index.postings = new Map();
+  assert.equal(searchServers('weather', staticServers, { index }).total, 0);
+});
+
+test('ignores postings built for a different corpus', () => {
+  const other = corpusIndexFromSearchIndex(roundTrip(tiny));
+  assert.equal(
+    searchServers('weather', staticServers, { index: other }).total,
+    searchServers('weather', staticServers).total,
+  );
+});
+
+console.log(`\n${passed} passed`);
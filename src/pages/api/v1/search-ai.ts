@@ -18,7 +18,12 @@
  */
 import type { APIRoute } from 'astro';
 import { staticServers } from '../../../data/staticServers.js';
-import { searchServers, summarizeFilters } from '../../../lib/search-engine.js';
+import {
+  buildSearchIndex,
+  corpusIndexFromSearchIndex,
+  searchServers,
+  summarizeFilters,
+} from '../../../lib/search-engine.js';
 import { getSecurityAudit } from '../../../data/securityAudit';
 
 export const prerender = false;
@@ -73,13 +78,18 @@ const corpus = (staticServers as any[]).map((s) => {
   return audit ? { ...s, securityAudit: audit } : s;
 });
 
+// IDF statistics and postings depend only on the corpus, so build them once
+// per isolate instead of on every query. The corpus is bundled source, so
+// there is no prebuilt search-index.json to load here (unlike mcp-search-server).
+const corpusIndex = corpusIndexFromSearchIndex(buildSearchIndex(corpus));
+
 export const GET: APIRoute = async ({ url }) => {
   const params = url.searchParams;
   const query = params.get('q') || '';
   const limit = Math.min(Math.max(parseInt(params.get('limit') || '12', 10), 1), 24);
 
   try {
-    const result = searchServers(query, corpus, { limit });
+    const result = searchServers(query, corpus, { limit, index: corpusIndex });
 
     const hits = result.hits.map((h) => {
       const f = h.server.fields;